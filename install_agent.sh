@@ -75,7 +75,7 @@ fi
 # Install dependencies
 echo "Installing Python dependencies..."
 sudo -u "$SERVICE_USER" "$PYTHON_VENV/bin/pip" install --upgrade pip
-sudo -u "$SERVICE_USER" "$PYTHON_VENV/bin/pip" install flask pyyaml waitress psutil
+sudo -u "$SERVICE_USER" "$PYTHON_VENV/bin/pip" install flask pyyaml waitress psutil orjson
 
 # Copy example configuration file if it doesn't exist
 if [ ! -f "$INSTALL_DIR/agent_config.yaml" ]; then
@@ -5,16 +5,18 @@ A lightweight Flask service that provides system metrics via HTTP API.
 This service is designed to run on each cluster node.
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 import os
 import subprocess
 import logging
 import atexit
+import time
 from waitress import serve
 
-from agent_config import load_config, DEFAULT_THERMAL_PATH, DEFAULT_HOST, DEFAULT_PORT
+from agent_config import load_config
 from agent_temperature_reader import AgentTemperatureReader
 from agent_system_reader import AgentSystemReader, PSUTIL_AVAILABLE
+from json_provider import init_json_provider
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -24,15 +26,19 @@ logger = logging.getLogger(__name__)
 config = load_config(logger, "../agent_config.yaml")
 
 # Configure logging from config
-log_level = config.get('logging', {}).get('level', 'INFO')
+log_level = config['logging.level']
 logging.getLogger().setLevel(getattr(logging, log_level.upper()))
 
 app = Flask(__name__)
+init_json_provider(app)
 
 # Initialize temperature reader with config (backward compatibility)
-thermal_path = config.get('temperature', {}).get('thermal_path', DEFAULT_THERMAL_PATH)
+thermal_path = config['temperature.thermal_path']
 temp_reader = AgentTemperatureReader(logger, thermal_path)
 
+# Sysfs thermal entries don't appear or vanish at runtime, so check once
+THERMAL_AVAILABLE = os.path.exists(thermal_path)
+
 # Initialize system reader (comprehensive metrics)
 system_reader = None
 if PSUTIL_AVAILABLE:
@@ -43,7 +49,12 @@ else:
     logger.warning("psutil not installed – /api/system endpoint disabled")
 
 # Device description from config
-device_description = config.get('device', {}).get('description', '')
+device_description = config['device.description']
+
+# The kernel updates thermal zones at ~1 Hz, so answer bursts of polls from
+# the last reading: (monotonic_ns, temperature)
+TEMPERATURE_CACHE_TTL_NS = 250_000_000
+_temp_cache = (0, None)
 
 
 @app.route('/api/system', methods=['GET'])
@@ -69,7 +80,13 @@ def get_temperature():
     API endpoint to get the current system temperature (backward compatible).
     Returns JSON with temperature in Celsius or error message.
     """
-    temperature = temp_reader.read_temperature()
+    global _temp_cache
+
+    now = time.monotonic_ns()
+    cached_at, temperature = _temp_cache
+    if cached_at == 0 or now - cached_at >= TEMPERATURE_CACHE_TTL_NS:
+        temperature = temp_reader.read_temperature()
+        _temp_cache = (now, temperature)
 
     if temperature is not None:
         return jsonify({
@@ -112,29 +129,40 @@ def shutdown():
         }), 500
 
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """
-    Health check endpoint to verify service is running.
-    """
-    return jsonify({
+def _build_health_json():
+    """Serialize the health response; every field is fixed between refreshes"""
+    return app.json.dumps({
         'success': True,
         'status': 'healthy',
         'service': 'nanocluster-agent',
         'thermal_path': temp_reader.thermal_path,
-        'thermal_available': os.path.exists(temp_reader.thermal_path),
+        'thermal_available': THERMAL_AVAILABLE,
         'psutil_available': PSUTIL_AVAILABLE,
-    })
+    }).encode()
 
 
-@app.route('/', methods=['GET'])
-def index():
+_HEALTH_JSON = _build_health_json()
+
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
     """
-    Simple index page with service information and links.
+    Health check endpoint to verify service is running.
+    Pass ?refresh=1 to re-check whether the thermal file exists.
     """
-    temperature = temp_reader.read_temperature()
+    global THERMAL_AVAILABLE, _HEALTH_JSON, _INDEX_PREFIX
+
+    if request.args.get('refresh') == '1':
+        THERMAL_AVAILABLE = os.path.exists(temp_reader.thermal_path)
+        _HEALTH_JSON = _build_health_json()
+        _INDEX_PREFIX = _build_index_prefix()
+
+    return Response(_HEALTH_JSON, mimetype='application/json')
 
-    html = f"""
+
+def _build_index_prefix():
+    """Render the static head and service info card of the index page as UTF-8 bytes"""
+    return f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -159,27 +187,23 @@ def index():
             <div class="card info">
                 <h3>Service Information</h3>
                 <p><strong>Thermal Path:</strong> <code>{temp_reader.thermal_path}</code></p>
-                <p><strong>File Exists:</strong> {os.path.exists(temp_reader.thermal_path)}</p>
+                <p><strong>File Exists:</strong> {THERMAL_AVAILABLE}</p>
                 <p><strong>psutil Available:</strong> {PSUTIL_AVAILABLE}</p>
             </div>
-    """
+    """.encode()
 
-    if temperature is not None:
-        html += f"""
-            <div class="card success">
-                <h3>Current Temperature</h3>
-                <p style="font-size: 24px; font-weight: bold;">{temperature:.1f}°C</p>
-            </div>
-        """
-    else:
-        html += """
+
+# The index page is static apart from the temperature card; render the rest once
+_INDEX_PREFIX = _build_index_prefix()
+
+_INDEX_TEMPERATURE_FAILED = """
             <div class="card error">
                 <h3>Temperature Reading Failed</h3>
                 <p>Unable to read temperature from thermal zone.</p>
             </div>
-        """
+        """.encode()
 
-    html += """
+_INDEX_SUFFIX = """
             <div class="card info">
                 <h3>API Endpoints</h3>
                 <ul>
@@ -191,15 +215,32 @@ def index():
         </div>
     </body>
     </html>
+    """.encode()
+
+
+@app.route('/', methods=['GET'])
+def index():
+    """
+    Simple index page with service information and links.
     """
+    temperature = temp_reader.read_temperature()
+
+    if temperature is not None:
+        status_html = f"""
+            <div class="card success">
+                <h3>Current Temperature</h3>
+                <p style="font-size: 24px; font-weight: bold;">{temperature:.1f}°C</p>
+            </div>
+        """.encode()
+    else:
+        status_html = _INDEX_TEMPERATURE_FAILED
 
-    return html
+    return Response(_INDEX_PREFIX + status_html + _INDEX_SUFFIX, mimetype='text/html')
 
 
 if __name__ == '__main__':
-    server_config = config.get('server', {})
-    host = server_config.get('host', DEFAULT_HOST)
-    port = server_config.get('port', DEFAULT_PORT)
+    host = config['server.host']
+    port = config['server.port']
 
     logger.info(f"Starting NanoCluster Agent on {host}:{port}")
     logger.info(f"Thermal zone path: {temp_reader.thermal_path}")
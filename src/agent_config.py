@@ -1,34 +1,53 @@
 import os
 import yaml
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 DEFAULT_THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
 DEFAULT_HOST = "0.0.0.0"
 DEFAULT_PORT = 5001
 
+# Flattened "section.key" defaults, merged under whatever the config file sets
+DEFAULT_CONFIG = {
+    'server.host': DEFAULT_HOST,
+    'server.port': DEFAULT_PORT,
+    'server.debug': False,
+    'temperature.thermal_path': DEFAULT_THERMAL_PATH,
+    'logging.level': 'INFO',
+    'device.description': '',
+}
+
+
+def _flatten(config):
+    """Flatten {'section': {'key': value}} into {'section.key': value}"""
+    flat = {}
+    for section, values in (config or {}).items():
+        if isinstance(values, dict):
+            for key, value in values.items():
+                flat[f"{section}.{key}"] = value
+        else:
+            flat[section] = values
+    return flat
+
+
 def load_config(logger, config_file='client_config.yaml'):
-    """Load configuration from YAML file"""
+    """
+    Load configuration from YAML file.
+    Returns a flat dict keyed by "section.key" with defaults filled in.
+    """
     config_path = os.path.join(os.path.dirname(__file__), config_file)
 
     try:
         if os.path.exists(config_path):
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                logger.info(f"Loaded configuration from {config_path}")
-                return config
+                config = yaml.load(f, Loader=_Loader)
+            logger.info(f"Loaded configuration from {config_path}")
+            return DEFAULT_CONFIG | _flatten(config)
     except Exception as e:
         logger.warning(f"Could not load config file {config_path}: {e}")
 
     # Return default config if file doesn't exist or can't be loaded
-    return {
-        'server': {
-            'host': DEFAULT_HOST,
-            'port': DEFAULT_PORT,
-            'debug': False
-        },
-        'temperature': {
-            'thermal_path': DEFAULT_THERMAL_PATH
-        },
-        'logging': {
-            'level': 'INFO'
-        }
-    }
\ No newline at end of file
+    return dict(DEFAULT_CONFIG)
@@ -127,8 +127,12 @@ class AgentSystemReader:
         try:
             if not os.path.exists(self.thermal_path):
                 return None
-            with open(self.thermal_path, 'r') as f:
-                return float(f.read().strip()) / 1000.0
+            with open(self.thermal_path, 'rb', buffering=0) as f:
+                buf = f.read(16)
+            nl = buf.find(b'\n')
+            if nl >= 0:
+                buf = buf[:nl]
+            return int(buf) / 1000.0
         except Exception as e:
             self.logger.error(f"Error reading temperature: {e}")
             return None
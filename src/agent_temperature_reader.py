@@ -1,5 +1,6 @@
-
 import os
+import logging
+import threading
 from typing import Optional
 
 class AgentTemperatureReader:
@@ -7,33 +8,65 @@ class AgentTemperatureReader:
         self.logger = logger
         self.thermal_path = thermal_path
 
+        # Keep the thermal file open and re-read it with pread() on every request;
+        # the lock keeps request threads from reopening or closing it under each other
+        self._fd_lock = threading.Lock()
+        self._fd = None
+        if thermal_path:
+            try:
+                self._fd = os.open(thermal_path, os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                # Reported (and retried) on the first read
+                pass
+
+    def close(self):
+        """Release the cached thermal file descriptor"""
+        with self._fd_lock:
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
+
+    def __del__(self):
+        self.close()
+
     def read_temperature(self) -> Optional[float]:
         """
         Read temperature from the thermal zone file.
         Returns temperature in Celsius or None if reading fails.
         """
         try:
-            if not os.path.exists(self.thermal_path):
-                self.logger.error(f"Thermal zone file not found: {self.thermal_path}")
-                return None
+            with self._fd_lock:
+                if self._fd is None:
+                    self._fd = os.open(self.thermal_path, os.O_RDONLY | os.O_CLOEXEC)
+                buf = os.pread(self._fd, 16, 0)
 
-            with open(self.thermal_path, 'r') as f:
-                temp_millidegrees = f.read().strip()
+            nl = buf.find(b'\n')
+            if nl >= 0:
+                buf = buf[:nl]
 
             # Convert from millidegrees to degrees Celsius
-            temp_celsius = float(temp_millidegrees) / 1000.0
-            self.logger.debug(f"Read temperature: {temp_celsius}°C")
+            temp_celsius = int(buf) / 1000.0
+            # Hot path: skip building the log record entirely unless DEBUG is on
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Read temperature: %s°C", temp_celsius)
             return temp_celsius
 
         except FileNotFoundError:
+            self.close()
             self.logger.error(f"Thermal zone file not found: {self.thermal_path}")
             return None
         except PermissionError:
+            self.close()
             self.logger.error(f"Permission denied reading thermal zone file: {self.thermal_path}")
             return None
         except ValueError as e:
             self.logger.error(f"Invalid temperature data in {self.thermal_path}: {e}")
             return None
         except Exception as e:
+            # Drop the descriptor so the next read reopens the file
+            self.close()
             self.logger.error(f"Unexpected error reading temperature: {e}")
-            return None
\ No newline at end of file
+            return None
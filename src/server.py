@@ -10,11 +10,13 @@ _config_path = os.path.join(_project_root, 'config.yaml')
 runtime_dir = os.environ.get('RUNTIME_DIRECTORY', '/tmp')
 os.chdir(runtime_dir)
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from server_config_manager import ConfigManager
 from server_temperature_monitor import TemperatureMonitor
+from json_provider import init_json_provider
 import logging
 import atexit
+import hashlib
 from waitress import serve
 
 # Setup Logging
@@ -22,6 +24,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+init_json_provider(app)
 config_manager = ConfigManager(config_path=_config_path)
 
 # Initialize temperature monitor
@@ -31,6 +34,39 @@ temperature_monitor.start_monitoring()
 # Register shutdown handler to stop monitoring on exit
 atexit.register(temperature_monitor.stop_monitoring)
 
+# Pre-serialized bodies (and their ETags) for the config-backed endpoints;
+# refreshed on config changes
+_nodes_json = b''
+_nodes_etag = ''
+_fan_config_json = b''
+_fan_config_etag = ''
+
+
+def _etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _refresh_config_json():
+    """Re-serialize the cached node list and fan config responses"""
+    global _nodes_json, _nodes_etag, _fan_config_json, _fan_config_etag
+    _nodes_json = app.json.dumps(config_manager.get_nodes()).encode()
+    _nodes_etag = _etag(_nodes_json)
+    _fan_config_json = app.json.dumps(config_manager.get_fan_config()).encode()
+    _fan_config_etag = _etag(_fan_config_json)
+
+
+def _cached_json_response(body: bytes, etag: str) -> Response:
+    """Return a pre-serialized JSON body, or 304 if the client already has it"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+
+_refresh_config_json()
+
 
 @app.route('/')
 def index():
@@ -100,8 +136,7 @@ def api_dashboard():
 @app.route('/api/nodes')
 def api_nodes():
     """API endpoint to get all nodes"""
-    nodes = config_manager.get_nodes()
-    return jsonify(nodes)
+    return _cached_json_response(_nodes_json, _nodes_etag)
 
 
 @app.route('/api/nodes/temperatures')
@@ -127,8 +162,7 @@ def api_nodes_status():
 @app.route('/api/nodes/<node_name>/shutdown', methods=['POST'])
 def api_node_shutdown(node_name):
     """API endpoint to shut down a specific node via its agent"""
-    nodes = config_manager.get_nodes()
-    node = next((n for n in nodes if n['name'] == node_name), None)
+    node = config_manager.get_node(node_name)
 
     if not node:
         return jsonify({'success': False, 'error': f'Node {node_name} not found'}), 404
@@ -164,8 +198,7 @@ def api_cluster_shutdown():
 @app.route('/api/fan/config')
 def api_fan_config():
     """API endpoint to get fan configuration"""
-    fan_config = config_manager.get_fan_config()
-    return jsonify(fan_config)
+    return _cached_json_response(_fan_config_json, _fan_config_etag)
 
 
 @app.route('/api/fan/status')
@@ -237,6 +270,7 @@ def api_fan_config_update():
         return jsonify({'success': False, 'error': 'No valid fields to update'}), 400
 
     config_manager.update_fan_config(updates)
+    _refresh_config_json()
     temperature_monitor.apply_fan_config()
 
     return jsonify({'success': True, 'config': config_manager.get_fan_config()})
@@ -244,4 +278,6 @@ def api_fan_config_update():
 
 if __name__ == '__main__':
     host, port = config_manager.get_server_config()
-    serve(app, host=host, port=port)
+    # Several worker threads so a slow agent (e.g. a node shutdown request) does
+    # not block the dashboard; one process keeps a single TemperatureMonitor
+    serve(app, host=host, port=port, threads=8)
@@ -1,12 +1,69 @@
 import yaml
 import os
-from typing import Dict, List, Any
+from dataclasses import dataclass, fields
+from typing import Dict, List, Any, Optional
+
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+def _from_section(cls, section: Optional[Dict[str, Any]]):
+    """Build a settings dataclass from a config section, keeping defaults for missing keys"""
+    section = section or {}
+    return cls(**{f.name: section[f.name] for f in fields(cls) if f.name in section})
+
+
+@dataclass(frozen=True, slots=True)
+class ServerSettings:
+    host: str = '0.0.0.0'
+    port: int = 5000
+
+
+@dataclass(frozen=True, slots=True)
+class FanSettings:
+    gpio_chip: int = 0
+    gpio_pin: int = 13
+    min_temp: float = 40
+    max_temp: float = 70
+    min_speed: int = 30
+    max_speed: int = 100
+    pwm_frequency: int = 50
+    pwm_reverse: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class MonitoringSettings:
+    interval_seconds: float = 30
+    endpoint: str = '/api/temperature'
+    timeout: float = 5
+    debug: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Read-only snapshot of the scalar configuration values with defaults applied"""
+    server: ServerSettings
+    fan: Optional[FanSettings]  # None if the config has no fan section
+    monitoring: MonitoringSettings
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Settings':
+        fan = config.get('fan')
+        return cls(
+            server=_from_section(ServerSettings, config.get('server')),
+            fan=_from_section(FanSettings, fan) if fan else None,
+            monitoring=_from_section(MonitoringSettings, config.get('temperature_monitoring')),
+        )
 
 
 class ConfigManager:
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = config_path
         self.config = self.load_config()
+        self.settings = Settings.from_config(self.config)
+        self._nodes_by_name = None
 
     def load_config(self) -> Dict[str, Any]:
         """Load the configuration from the YAML file"""
@@ -14,7 +71,7 @@ class ConfigManager:
             self.create_default_config()
 
         with open(self.config_path, 'r') as file:
-            return yaml.safe_load(file) or {}
+            return yaml.load(file, Loader=_Loader) or {}
 
     def create_default_config(self):
         """Create a default configuration file"""
@@ -50,12 +107,22 @@ class ConfigManager:
         if config_dir:
             os.makedirs(config_dir, exist_ok=True)
         with open(self.config_path, 'w') as file:
-            yaml.dump(default_config, file, default_flow_style=False)
+            yaml.dump(default_config, file, Dumper=_Dumper, default_flow_style=False)
 
     def get_nodes(self) -> List[Dict[str, Any]]:
         """Get all nodes from the configuration"""
         return self.config.get('nodes', [])
 
+    def get_node(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get a single node by name, or None if it is not configured"""
+        if self._nodes_by_name is None:
+            # First node wins on duplicate names, like a linear scan would
+            nodes_by_name = {}
+            for node in self.get_nodes():
+                nodes_by_name.setdefault(node['name'], node)
+            self._nodes_by_name = nodes_by_name
+        return self._nodes_by_name.get(name)
+
     def get_enabled_nodes(self) -> List[Dict[str, Any]]:
         """Get all enabled nodes from the configuration"""
         return [node for node in self.get_nodes() if node.get('enabled', False)]
@@ -66,11 +133,8 @@ class ConfigManager:
 
     def get_server_config(self) -> (str, int):
         """Get the server configuration"""
-        server = self.config.get('server', {})
-        host = server.get('host', '0.0.0.0')
-        port = server.get('port', 5000)
-
-        return host, port
+        server = self.settings.server
+        return server.host, server.port
 
     def add_node(self, name: str, slot: int, ip: str, port: int = 5000, enabled: bool = True):
         """Add a new node to the configuration"""
@@ -83,12 +147,13 @@ class ConfigManager:
             'enabled': enabled
         })
         self.config['nodes'] = nodes
+        self._nodes_by_name = None
         self.save_config()
 
     def save_config(self):
         """Store the current configuration to the YAML file"""
         with open(self.config_path, 'w') as file:
-            yaml.dump(self.config, file, default_flow_style=False)
+            yaml.dump(self.config, file, Dumper=_Dumper, default_flow_style=False)
 
     def update_fan_config(self, updates: Dict[str, Any]):
         """Update the fan configuration with the given values and save to disk"""
@@ -97,6 +162,7 @@ class ConfigManager:
         for key, value in updates.items():
             if key in allowed_keys:
                 fan[key] = value
+        self.settings = Settings.from_config(self.config)
         self.save_config()
 
     def get_temperature_monitoring_config(self) -> Dict[str, Any]:
@@ -1,20 +1,51 @@
 import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
-from server_config_manager import ConfigManager
+from server_config_manager import ConfigManager, FanSettings, MonitoringSettings
 import lgpio
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# Number of temperature samples kept per node
+HISTORY_SIZE = 100
+
+# Upper bound (seconds) for the retry backoff of nodes that keep failing
+MAX_NODE_BACKOFF = 300
+
+
+class TempSample(NamedTuple):
+    """One stored temperature reading"""
+    ts_ns: int
+    temperature: float
+
+
+def _format_timestamp(ts_ns: int) -> str:
+    """Format a time.time_ns() value as a local ISO 8601 timestamp"""
+    return datetime.fromtimestamp(ts_ns / 1_000_000_000).isoformat()
+
 
 class TemperatureMonitor:
     def __init__(self, config_manager: ConfigManager):
         self.config_manager = config_manager
-        self.temperature_data = {}
+        self.temperature_data = {}  # node_name -> deque of the last HISTORY_SIZE TempSamples
+        self._latest_temp = {}  # node_name -> most recent temperature, for fan control
+        self._data_lock = threading.Lock()  # guards temperature_data and _latest_temp
+        self._node_urls = {}  # (ip, port, endpoint) -> (system URL, temperature URL)
         self.system_data = {}  # node_name -> latest full system data
         self.node_online_status = {}  # node_name -> True/False
+        self._node_failures = {}  # node_name -> consecutive failed polls
+        self._node_backoff = {}  # node_name -> time.monotonic() before which the node is skipped
         self.fan_speed = 0
         self.fan_mode = 'auto'  # 'auto' or 'manual'
         self.manual_fan_speed = 0
@@ -22,13 +53,27 @@ class TemperatureMonitor:
         self.monitor_thread = None
         self._stop_event = threading.Event()
         self._gpio_handle = None
+        self._last_pwm = None  # (frequency, duty cycle) last written to the GPIO
+        self._fan_lock = threading.Lock()  # serializes fan updates from the monitor and request threads
+
+        node_count = max(1, len(self.config_manager.get_enabled_nodes()))
+
+        # Shared HTTP session so connections to the agents are kept alive and reused
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=node_count, pool_maxsize=node_count, max_retries=0)
+        self._session.mount('http://', adapter)
+
+        # Nodes are polled in parallel so one slow node doesn't delay the others;
+        # the pool lives from start_monitoring() to stop_monitoring()
+        self._poll_workers = node_count
+        self._executor = None
 
         # The debug mode allows running without GPIO for testing purposes
-        self.debug = self.config_manager.get_temperature_monitoring_config().get('debug', False)
+        self.debug = self.config_manager.settings.monitoring.debug
+        fan_settings = self.config_manager.settings.fan or FanSettings()
 
         if not self.debug:
-            fan_config = self.config_manager.get_fan_config()
-            gpio_chip = fan_config.get('gpio_chip', 0)
+            gpio_chip = fan_settings.gpio_chip
             try:
                 self._gpio_handle = lgpio.gpiochip_open(gpio_chip)
             except lgpio.error as e:
@@ -37,7 +82,7 @@ class TemperatureMonitor:
                     f"Make sure /dev/gpiochip{gpio_chip} exists and you have permission to access it."
                 ) from e
 
-        self.gpio_pin = self.config_manager.get_fan_config().get('gpio_pin', 13)
+        self.gpio_pin = fan_settings.gpio_pin
 
     def start_monitoring(self):
         """Starts temperature monitoring in the background"""
@@ -47,6 +92,7 @@ class TemperatureMonitor:
 
         self.is_running = True
         self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self._poll_workers, thread_name_prefix='node-poll')
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         logger.info("Temperature monitoring started")
@@ -60,78 +106,120 @@ class TemperatureMonitor:
         self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._session.close()
 
         # Close GPIO handle
-        if self._gpio_handle is not None:
-            try:
-                lgpio.tx_pwm(self._gpio_handle, self.gpio_pin, 0, 0)
-                lgpio.gpiochip_close(self._gpio_handle)
-                self._gpio_handle = None
-            except lgpio.error:
-                pass
+        with self._fan_lock:
+            if self._gpio_handle is not None:
+                try:
+                    lgpio.tx_pwm(self._gpio_handle, self.gpio_pin, 0, 0)
+                    lgpio.gpiochip_close(self._gpio_handle)
+                    self._gpio_handle = None
+                    self._last_pwm = None
+                except lgpio.error:
+                    pass
 
         logger.info("Temperature monitoring stopped")
 
     def _monitor_loop(self):
         """Main loop for temperature monitoring"""
-        config = self.config_manager.get_temperature_monitoring_config()
-        interval = config.get('interval_seconds', 30)
+        interval = self.config_manager.settings.monitoring.interval_seconds
 
         while self.is_running and not self._stop_event.is_set():
             try:
-                self._poll_all_nodes()
+                self._poll_all_nodes(self.config_manager.settings.monitoring)
             except Exception as e:
                 logger.error(f"Error during temperature polling: {e}")
 
-            # Wait for the configured interval or until stop event is set
-            self._stop_event.wait(timeout=interval)
-            self._set_fan_speed_based_on_temperature()
+            # A stop during the poll must not touch the fan after stop_monitoring() released it
+            if self._stop_event.is_set():
+                break
+
+            # Apply the fresh readings right away instead of after the wait
+            self._set_fan_speed_based_on_temperature(self.config_manager.settings.fan)
+
+            # Wait for the configured interval; leave immediately if stop was requested
+            if self._stop_event.wait(timeout=interval):
+                break
 
-    def _poll_all_nodes(self):
+    def _poll_all_nodes(self, monitoring: MonitoringSettings):
         """Polls all active nodes for their system data and temperature"""
-        enabled_nodes = self.config_manager.get_enabled_nodes()
-        config = self.config_manager.get_temperature_monitoring_config()
-        endpoint = config.get('endpoint', '/api/temperature')
-        timeout = config.get('timeout', 5)
+        now = time.monotonic()
+        enabled_nodes = [
+            node for node in self.config_manager.get_enabled_nodes()
+            if self._node_backoff.get(node['name'], 0) <= now
+        ]
+        endpoint = monitoring.endpoint
+        timeout = monitoring.timeout
+
+        # _poll_node handles its own errors, so draining the results just waits for all nodes
+        for _ in self._executor.map(lambda node: self._poll_node(node, endpoint, timeout), enabled_nodes):
+            pass
+
+    def _get_node_urls(self, node: Dict[str, Any], endpoint: str) -> Tuple[str, str]:
+        """Returns the (system, temperature) URLs of a node, building them only once"""
+        key = (node['ip'], node['port'], endpoint)
+        urls = self._node_urls.get(key)
+        if urls is None:
+            base = f"http://{node['ip']}:{node['port']}"
+            urls = self._node_urls[key] = (f"{base}/api/system", f"{base}{endpoint}")
+        return urls
+
+    def _poll_node(self, node: Dict[str, Any], endpoint: str, timeout: int):
+        """Polls a single node for its system data, falling back to the temperature endpoint"""
+        try:
+            system_url, temperature_url = self._get_node_urls(node, endpoint)
 
-        for node in enabled_nodes:
-            try:
-                # Try the comprehensive /api/system endpoint first
-                sys_data = self._poll_node_system(node, timeout)
-                if sys_data:
-                    sys_data['timestamp'] = datetime.now().isoformat()
-                    self.system_data[node['name']] = sys_data
-                    self.node_online_status[node['name']] = True
-
-                    # Also store temperature for fan control
-                    temperature = sys_data.get('temperature')
-                    if temperature is not None:
-                        self._store_temperature_data(node, temperature)
-                    continue
-
-                # Fallback to the legacy /api/temperature endpoint
-                temperature = self._poll_node_temperature(node, endpoint, timeout)
+            # Try the comprehensive /api/system endpoint first
+            sys_data = self._poll_node_system(node, system_url, timeout)
+            if sys_data:
+                sys_data['timestamp'] = datetime.now().isoformat()
+                self.system_data[node['name']] = sys_data
+                self._set_node_online(node['name'], True)
+
+                # Also store temperature for fan control
+                temperature = sys_data.get('temperature')
                 if temperature is not None:
                     self._store_temperature_data(node, temperature)
-                    self.node_online_status[node['name']] = True
-                else:
-                    self.node_online_status[node['name']] = False
-            except Exception as e:
-                self.node_online_status[node['name']] = False
-                logger.error(f"Failed to poll node {node['name']}: {e}")
+                return
 
-    def _poll_node_system(self, node: Dict[str, Any], timeout: int) -> Optional[Dict[str, Any]]:
-        """Poll a node for comprehensive system data via /api/system"""
-        url = f"http://{node['ip']}:{node['port']}/api/system"
+            # Fallback to the legacy /api/temperature endpoint
+            temperature = self._poll_node_temperature(node, temperature_url, timeout)
+            if temperature is not None:
+                self._store_temperature_data(node, temperature)
+                self._set_node_online(node['name'], True)
+            else:
+                self._set_node_online(node['name'], False)
+        except Exception as e:
+            self._set_node_online(node['name'], False)
+            logger.error(f"Failed to poll node {node['name']}: {e}")
+
+    def _set_node_online(self, node_name: str, online: bool):
+        """Records a poll result; nodes that keep failing are skipped with exponential backoff"""
+        self.node_online_status[node_name] = online
+
+        if online:
+            self._node_failures.pop(node_name, None)
+            self._node_backoff.pop(node_name, None)
+            return
 
+        failures = self._node_failures.get(node_name, 0) + 1
+        self._node_failures[node_name] = failures
+        self._node_backoff[node_name] = time.monotonic() + min(MAX_NODE_BACKOFF, 2 ** failures)
+
+    def _poll_node_system(self, node: Dict[str, Any], url: str, timeout: int) -> Optional[Dict[str, Any]]:
+        """Poll a node for comprehensive system data via /api/system"""
         try:
-            logger.debug(f"Polling system data from {node['name']} at {url}")
-            response = requests.get(url, timeout=timeout)
+            logger.debug("Polling system data from %s at %s", node['name'], url)
+            response = self._session.get(url, timeout=timeout)
             response.raise_for_status()
 
-            data = response.json()
+            data = json_loads(response.content)
             if data.get('success'):
-                logger.debug(f"Got system data from {node['name']}")
+                logger.debug("Got system data from %s", node['name'])
                 return data
             return None
 
@@ -142,26 +230,24 @@ class TemperatureMonitor:
             logger.warning(f"Connection error polling system data from {node['name']}")
             return None
         except requests.exceptions.RequestException as e:
-            logger.debug(f"System endpoint not available on {node['name']}: {e}")
+            logger.debug("System endpoint not available on %s: %s", node['name'], e)
             return None
         except (ValueError, KeyError) as e:
             logger.error(f"Invalid system data from {node['name']}: {e}")
             return None
 
-    def _poll_node_temperature(self, node: Dict[str, Any], endpoint: str, timeout: int) -> Optional[float]:
+    def _poll_node_temperature(self, node: Dict[str, Any], url: str, timeout: int) -> Optional[float]:
         """Polls a single node for its temperature (legacy endpoint)"""
-        url = f"http://{node['ip']}:{node['port']}{endpoint}"
-
         try:
-            logger.debug(f"Polling temperature from {node['name']} at {url}")
-            response = requests.get(url, timeout=timeout)
+            logger.debug("Polling temperature from %s at %s", node['name'], url)
+            response = self._session.get(url, timeout=timeout)
             response.raise_for_status()
 
-            data = response.json()
+            data = json_loads(response.content)
             temperature = data.get('temperature')
 
             if temperature is not None:
-                logger.debug(f"Node {node['name']} temperature: {temperature}°C")
+                logger.debug("Node %s temperature: %s°C", node['name'], temperature)
                 return float(temperature)
             else:
                 logger.warning(f"No temperature data in response from {node['name']}")
@@ -183,74 +269,73 @@ class TemperatureMonitor:
     def _store_temperature_data(self, node: Dict[str, Any], temperature: float):
         """Stores temperature data for a node"""
         node_name = node['name']
-        timestamp = datetime.now().isoformat()
-
-        if node_name not in self.temperature_data:
-            self.temperature_data[node_name] = []
-
-        # Add current temperature
-        self.temperature_data[node_name].append({
-            'timestamp': timestamp,
-            'temperature': temperature,
-        })
-
-        # Keep only the last 100 entries (to save memory)
-        if len(self.temperature_data[node_name]) > 100:
-            self.temperature_data[node_name] = self.temperature_data[node_name][-100:]
-
-        logger.info(f"Stored temperature data for {node_name}: {temperature}°C")
-
-    def _set_fan_speed_based_on_temperature(self):
-        """Sets the fan speed based on the current temperature data or manual override"""
-        fan_config = self.config_manager.get_fan_config()
-        if not fan_config:
+        # Samples keep the raw time_ns(); ISO formatting happens in the getters
+        ts_ns = time.time_ns()
+
+        with self._data_lock:
+            if node_name not in self.temperature_data:
+                self.temperature_data[node_name] = deque(maxlen=HISTORY_SIZE)
+
+            # Add current temperature (the deque drops the oldest entry once full)
+            self.temperature_data[node_name].append(TempSample(ts_ns, temperature))
+            self._latest_temp[node_name] = temperature
+
+        logger.debug("Stored temperature data for %s: %s°C", node_name, temperature)
+
+    def _set_fan_speed_based_on_temperature(self, fan: Optional[FanSettings] = None):
+        """
+        Sets the fan speed based on the current temperature data or manual override.
+        Uses the given fan settings, or the current ones if none are passed.
+        """
+        if fan is None:
+            fan = self.config_manager.settings.fan
+        if fan is None:
             logger.warning("Fan configuration not found")
             return
 
-        pwm_frequency = fan_config.get('pwm_frequency', 50)
-        pwm_reverse = fan_config.get('pwm_reverse', False)
-
-        if self.fan_mode == 'manual':
-            self.fan_speed = self.manual_fan_speed
-            logger.info(f"Fan in manual mode — speed fixed at {self.fan_speed}%")
-        else:
-            min_temp = fan_config.get('min_temp', 40)
-            max_temp = fan_config.get('max_temp', 70)
-            min_speed = fan_config.get('min_speed', 30)
-            max_speed = fan_config.get('max_speed', 100)
-
-            current_max_temp = float("-inf")
-            hottest_node = None
-
-            for node_name, data_list in self.temperature_data.items():
-                if not data_list:
-                    continue
-
-                latest_entry = data_list[-1]
-                temperature = latest_entry['temperature']
-
-                if temperature > current_max_temp:
-                    current_max_temp = temperature
-                    hottest_node = node_name
-
-            # Calculate fan speed based on temperature
-            if current_max_temp < min_temp:
-                self.fan_speed = min_speed
-            elif current_max_temp > max_temp:
-                self.fan_speed = max_speed
-            else:
-                # Linear interpolation between min and max
-                self.fan_speed = int(min_speed + (max_speed - min_speed) * (current_max_temp - min_temp) / (max_temp - min_temp))
-
-            logger.info(f"Setting fan speed to {self.fan_speed}% based on temperature {current_max_temp}°C ({hottest_node})")
+        with self._fan_lock:
+            pwm_frequency = fan.pwm_frequency
+            pwm_reverse = fan.pwm_reverse
+            previous_speed = self.fan_speed
 
-        # Set the actual fan speed via GPIO PWM
-        if not self.debug and self._gpio_handle is not None:
-            speed = self.fan_speed
-            if pwm_reverse:
-                speed = 100 - speed
-            # lgpio tx_pwm expects duty cycle as 0-100 percentage
-            lgpio.tx_pwm(self._gpio_handle, self.gpio_pin, pwm_frequency, speed)
+            if self.fan_mode == 'manual':
+                self.fan_speed = self.manual_fan_speed
+                logger.debug("Fan in manual mode — speed fixed at %s%%", self.fan_speed)
+            else:
+                min_temp = fan.min_temp
+                max_temp = fan.max_temp
+                min_speed = fan.min_speed
+                max_speed = fan.max_speed
+
+                with self._data_lock:
+                    latest_temp = dict(self._latest_temp)
+                hottest_node = max(latest_temp, key=latest_temp.__getitem__, default=None)
+                current_max_temp = latest_temp[hottest_node] if hottest_node is not None else float("-inf")
+
+                # Clamp the temperature into [min_temp, max_temp] and map it linearly onto the speed range
+                if max_temp > min_temp:
+                    t = max(min_temp, min(max_temp, current_max_temp))
+                    self.fan_speed = int(min_speed + (max_speed - min_speed) * (t - min_temp) / (max_temp - min_temp))
+                else:
+                    # Degenerate range (min_temp >= max_temp): switch at min_temp like the old if/elif chain
+                    self.fan_speed = max_speed if current_max_temp >= min_temp else min_speed
+
+                # Only log at INFO when the speed changes; the steady state goes to DEBUG
+                log_level = logging.INFO if self.fan_speed != previous_speed else logging.DEBUG
+                logger.log(log_level, "Setting fan speed to %s%% based on temperature %s°C (%s)",
+                           self.fan_speed, current_max_temp, hottest_node)
+
+            # Set the actual fan speed via GPIO PWM
+            if not self.debug and self._gpio_handle is not None:
+                speed = self.fan_speed
+                if pwm_reverse:
+                    speed = 100 - speed
+                # Only reprogram the PWM when frequency or duty cycle actually change
+                pwm = (pwm_frequency, speed)
+                if pwm != self._last_pwm:
+                    # lgpio tx_pwm expects duty cycle as 0-100 percentage
+                    lgpio.tx_pwm(self._gpio_handle, self.gpio_pin, pwm_frequency, speed)
+                    self._last_pwm = pwm
 
     def set_manual_speed(self, speed: int):
         """Switch to manual mode and set a fixed fan speed (0–100)"""
@@ -273,19 +358,29 @@ class TemperatureMonitor:
         """Returns the latest temperature data of all nodes"""
         latest_data = {}
 
-        for node_name, data_list in self.temperature_data.items():
-            if data_list:
-                latest_entry = data_list[-1]
-                latest_data[node_name] = {
-                    'temperature': latest_entry['temperature'],
-                    'timestamp': latest_entry['timestamp']
-                }
+        with self._data_lock:
+            latest_samples = {node_name: data[-1] for node_name, data in self.temperature_data.items() if data}
+
+        for node_name, latest_entry in latest_samples.items():
+            latest_data[node_name] = {
+                'temperature': latest_entry.temperature,
+                'timestamp': _format_timestamp(latest_entry.ts_ns)
+            }
 
         return latest_data
 
     def get_all_temperature_data(self) -> Dict[str, List[Dict[str, Any]]]:
         """Returns all stored temperature data"""
-        return self.temperature_data.copy()
+        with self._data_lock:
+            history = {node_name: list(data) for node_name, data in self.temperature_data.items()}
+
+        return {
+            node_name: [
+                {'timestamp': _format_timestamp(sample.ts_ns), 'temperature': sample.temperature}
+                for sample in data
+            ]
+            for node_name, data in history.items()
+        }
 
     def get_system_data(self) -> Dict[str, Any]:
         """Returns the latest system data for all nodes"""
@@ -305,15 +400,14 @@ class TemperatureMonitor:
 
     def shutdown_node(self, node: Dict[str, Any]) -> bool:
         """Sends a shutdown request to a node's agent. Returns True if request was accepted."""
-        config = self.config_manager.get_temperature_monitoring_config()
-        timeout = config.get('timeout', 5)
+        timeout = self.config_manager.settings.monitoring.timeout
         url = f"http://{node['ip']}:{node['port']}/api/shutdown"
 
         try:
             logger.warning(f"Sending shutdown request to {node['name']} at {url}")
-            response = requests.post(url, timeout=timeout)
+            response = self._session.post(url, timeout=timeout)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return data.get('success', False)
         except Exception as e:
             logger.error(f"Failed to send shutdown to {node['name']}: {e}")